@@ -118,6 +118,11 @@ cd $WORKSPACE/python
 
 pytest --cache-clear --junitxml=${WORKSPACE}/junit-cuml.xml -v -s -m "not memleak" --durations=50 --timeout=300 --ignore=cuml/test/dask
 
+if [ "$BUILD_MODE" = "branch" ]; then
+    logger "Python pytest for cuml slow tests..."
+    pytest --cache-clear --junitxml=${WORKSPACE}/junit-cuml-slow.xml -v -s -m "slow and not memleak" --run_slow --durations=50 --timeout=300 --ignore=cuml/test/dask
+fi
+
 timeout 7200 sh -c "pytest cuml/test/dask --cache-clear --junitxml=${WORKSPACE}/junit-cuml-mg.xml -v -s -m 'not memleak' --durations=50 --timeout=300"
 
 
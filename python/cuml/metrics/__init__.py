@@ -25,6 +25,8 @@ from cuml.metrics._ranking import roc_auc_score
 from cuml.metrics._classification import log_loss
 from cuml.metrics.cluster.homogeneity_score import homogeneity_score
 from cuml.metrics.cluster.completeness_score import completeness_score
+from cuml.metrics.cluster.homogeneity_and_completeness import \
+    homogeneity_and_completeness
 from cuml.metrics.cluster.mutual_info_score import mutual_info_score
 from cuml.metrics.confusion_matrix import confusion_matrix
 from cuml.metrics.cluster.entropy import cython_entropy as entropy
@@ -17,5 +17,7 @@
 from cuml.metrics.cluster.adjustedrandindex import adjusted_rand_score
 from cuml.metrics.cluster.homogeneity_score import homogeneity_score
 from cuml.metrics.cluster.completeness_score import completeness_score
+from cuml.metrics.cluster.homogeneity_and_completeness import \
+    homogeneity_and_completeness
 from cuml.metrics.cluster.mutual_info_score import mutual_info_score
 from cuml.metrics.cluster.entropy import cython_entropy as entropy
@@ -0,0 +1,122 @@
+#
+# Copyright (c) 2020, NVIDIA CORPORATION.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# cython: profile=False
+# distutils: language = c++
+# cython: embedsignature = True
+# cython: language_level = 3
+
+from cuml.common.handle cimport cumlHandle
+from libc.stdint cimport uintptr_t
+from cuml.metrics.cluster.utils import prepare_cluster_metric_inputs
+import cuml.common.handle
+
+
+cdef extern from "cuml/metrics/metrics.hpp" namespace "ML::Metrics":
+    double mutualInfoScore(const cumlHandle &handle,
+                           const int *y,
+                           const int *y_hat,
+                           const int n,
+                           const int lower_class_range,
+                           const int upper_class_range) except +
+
+    double entropy(const cumlHandle &handle,
+                   const int *y,
+                   const int n,
+                   const int lower_class_range,
+                   const int upper_class_range) except +
+
+
+def homogeneity_and_completeness(labels_true, labels_pred, handle=None):
+    """
+    Computes both the homogeneity and the completeness metrics of a cluster
+    labeling given a ground truth.
+
+    This is equivalent to calling `homogeneity_score` and
+    `completeness_score` on the same labels, but the inputs are only prepared
+    once and the mutual information, which both scores are normalized from,
+    is only computed once.
+
+    The labels in labels_pred and labels_true are assumed to be drawn from a
+    contiguous set (Ex: drawn from {2, 3, 4}, but not from {2, 4}). If your
+    set of labels looks like {2, 4}, convert them to something like {0, 1}.
+
+    Parameters
+    ----------
+    labels_pred : array-like (device or host) shape = (n_samples,)
+        The labels predicted by the model for the test dataset.
+        Acceptable formats: cuDF DataFrame, NumPy ndarray, Numba device
+        ndarray, cuda array interface compliant array like CuPy
+    labels_true : array-like (device or host) shape = (n_samples,)
+        The ground truth labels (ints) of the test dataset.
+        Acceptable formats: cuDF DataFrame, NumPy ndarray, Numba device
+        ndarray, cuda array interface compliant array like CuPy
+    handle : cuml.Handle
+        Specifies the cuml.handle that holds internal CUDA state for
+        computations in this model. Most importantly, this specifies the CUDA
+        stream that will be used for the model's computations, so users can
+        run different models concurrently in different streams by creating
+        handles in several streams.
+        If it is None, a new one is created.
+
+    Returns
+    -------
+    (float, float)
+      The homogeneity and the completeness of the predicted labeling given
+      the ground truth, both between 0.0 and 1.0.
+    """
+    # make_monotonic cannot launch its kernel on empty labels, so empty
+    # labelings are answered before preparing the inputs. Like in sklearn,
+    # they are perfectly homogeneous and complete.
+    if len(labels_true) == 0 and len(labels_pred) == 0:
+        return 1.0, 1.0
+
+    handle = cuml.common.handle.Handle() if handle is None else handle
+    cdef cumlHandle *handle_ = <cumlHandle*> <size_t> handle.getHandle()
+
+    (y_true, y_pred,
+     n_rows,
+     lower_class_range, upper_class_range) = prepare_cluster_metric_inputs(
+        labels_true,
+        labels_pred
+    )
+
+    cdef uintptr_t ground_truth_ptr = y_true.ptr
+    cdef uintptr_t preds_ptr = y_pred.ptr
+
+    mi = mutualInfoScore(handle_[0],
+                         <int*> ground_truth_ptr,
+                         <int*> preds_ptr,
+                         <int> n_rows,
+                         <int> lower_class_range,
+                         <int> upper_class_range)
+
+    entropy_true = entropy(handle_[0],
+                           <int*> ground_truth_ptr,
+                           <int> n_rows,
+                           <int> lower_class_range,
+                           <int> upper_class_range)
+
+    entropy_pred = entropy(handle_[0],
+                           <int*> preds_ptr,
+                           <int> n_rows,
+                           <int> lower_class_range,
+                           <int> upper_class_range)
+
+    hom = mi / entropy_true if entropy_true else 1.0
+    com = mi / entropy_pred if entropy_pred else 1.0
+
+    return hom, com
@@ -32,8 +32,18 @@ def pytest_addoption(parser):
     parser.addoption("--run_unit", action="store_true",
                      default=False, help="run unit tests")
 
+    parser.addoption("--run_slow", action="store_true",
+                     default=False, help="run slow tests")
+
 
 def pytest_collection_modifyitems(config, items):
+    if not config.getoption("--run_slow"):
+        skip_slow = pytest.mark.skip(
+            reason="Slow tests run with --run_slow flag.")
+        for item in items:
+            if "slow" in item.keywords:
+                item.add_marker(skip_slow)
+
     if config.getoption("--run_quality"):
         # --run_quality given in cli: do not skip quality tests
         skip_stress = pytest.mark.skip(
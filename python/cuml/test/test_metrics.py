@@ -14,29 +14,25 @@
 # limitations under the License.
 #
 from itertools import chain, permutations
-from functools import partial
+from functools import lru_cache, partial
 
 import cuml
 import cupy as cp
 import numpy as np
 import pytest
 
-from cuml.ensemble import RandomForestClassifier as curfc
 from cuml.metrics.cluster import adjusted_rand_score as cu_ars
 from cuml.metrics import accuracy_score as cu_acc_score
 from cuml.test.utils import get_handle, get_pattern, array_equal, \
-    unit_param, quality_param, stress_param, generate_random_labels, \
-    score_labeling_with_handle
+    unit_param, quality_param, stress_param, generate_random_labels
 
 from numba import cuda
 from numpy.testing import assert_almost_equal
 
-from sklearn.datasets import make_classification
 from sklearn.metrics import accuracy_score as sk_acc_score
 from sklearn.metrics import log_loss as sklearn_log_loss
 from sklearn.metrics.cluster import adjusted_rand_score as sk_ars
-from sklearn.metrics.cluster import homogeneity_score as sk_homogeneity_score
-from sklearn.metrics.cluster import completeness_score as sk_completeness_score
+from sklearn.metrics.cluster import homogeneity_completeness_v_measure
 from sklearn.metrics.cluster import mutual_info_score as sk_mutual_info_score
 from sklearn.preprocessing import StandardScaler
 
@@ -57,30 +53,19 @@ from cuml.metrics import log_loss
 from sklearn.metrics import roc_auc_score as sklearn_roc_auc_score
 
 
-@pytest.mark.parametrize('datatype', [np.float32, np.float64])
-@pytest.mark.parametrize('use_handle', [True, False])
-def test_r2_score(datatype, use_handle):
-    a = np.array([0.1, 0.2, 0.3, 0.4, 0.5], dtype=datatype)
-    b = np.array([0.12, 0.22, 0.32, 0.42, 0.52], dtype=datatype)
+@pytest.fixture(scope="session", params=[True, False],
+                ids=['use_handle', 'no_handle'])
+def handle_stream(request):
+    # Creating a handle initializes the CUDA math libraries, so build it once
+    # per session and share it across all the tests of this module
+    return get_handle(request.param, n_streams=8)
 
-    a_dev = cuda.to_device(a)
-    b_dev = cuda.to_device(b)
 
-    handle, stream = get_handle(use_handle)
-
-    score = cuml.metrics.r2_score(a_dev, b_dev, handle=handle)
-
-    np.testing.assert_almost_equal(score, 0.98, decimal=7)
-
-
-def test_sklearn_search():
-    """Test ensures scoring function works with sklearn machinery
-    """
-    import numpy as np
-    from cuml import Ridge as cumlRidge
+@pytest.fixture(scope="session")
+def diabetes_data():
     import cudf
     from sklearn import datasets
-    from sklearn.model_selection import train_test_split, GridSearchCV
+    from sklearn.model_selection import train_test_split
     diabetes = datasets.load_diabetes()
     X_train, X_test, y_train, y_test = train_test_split(diabetes.data,
                                                         diabetes.target,
@@ -88,59 +73,76 @@ def test_sklearn_search():
                                                         shuffle=False,
                                                         random_state=1)
 
+    gdf_data = cudf.DataFrame(X_train)
+    gdf_train = cudf.DataFrame(dict(train=y_train))
+
+    return X_train, y_train, gdf_data, gdf_train
+
+
+@pytest.mark.parametrize('n_alphas, cv, best_alpha', [
+    (3, 2, None),
+    pytest.param(10, 5, 0.1, marks=pytest.mark.slow)
+])
+def test_sklearn_search(diabetes_data, n_alphas, cv, best_alpha):
+    """Test ensures scoring function works with sklearn machinery
+    """
+    import numpy as np
+    from cuml import Ridge as cumlRidge
+    from sklearn.linear_model import Ridge as skRidge
+    from sklearn.model_selection import GridSearchCV
+
     alpha = np.array([1.0])
     fit_intercept = True
     normalize = False
 
-    params = {'alpha': np.logspace(-3, -1, 10)}
+    params = {'alpha': np.logspace(-3, -1, n_alphas)}
     cu_clf = cumlRidge(alpha=alpha, fit_intercept=fit_intercept,
                        normalize=normalize, solver="eig")
 
     assert getattr(cu_clf, 'score', False)
-    sk_cu_grid = GridSearchCV(cu_clf, params, cv=5, iid=False)
-
-    gdf_data = cudf.DataFrame(X_train)
-    gdf_train = cudf.DataFrame(dict(train=y_train))
+    sk_cu_grid = GridSearchCV(cu_clf, params, cv=cv, iid=False)
 
+    X_train, y_train, gdf_data, gdf_train = diabetes_data
     sk_cu_grid.fit(gdf_data, gdf_train.train)
-    assert sk_cu_grid.best_params_ == {'alpha': 0.1}
-
-
-@pytest.mark.parametrize('nrows', [unit_param(30), quality_param(5000),
-                         stress_param(500000)])
-@pytest.mark.parametrize('ncols', [unit_param(10), quality_param(100),
-                         stress_param(200)])
-@pytest.mark.parametrize('n_info', [unit_param(7), quality_param(50),
-                         stress_param(100)])
-@pytest.mark.parametrize('datatype', [np.float32])
-def test_accuracy(nrows, ncols, n_info, datatype):
-
-    use_handle = True
-    train_rows = np.int32(nrows*0.8)
-    X, y = make_classification(n_samples=nrows, n_features=ncols,
-                               n_clusters_per_class=1, n_informative=n_info,
-                               random_state=123, n_classes=5)
-
-    X_test = np.asarray(X[train_rows:, 0:]).astype(datatype)
-    y_test = np.asarray(y[train_rows:, ]).astype(np.int32)
-    X_train = np.asarray(X[0:train_rows, :]).astype(datatype)
-    y_train = np.asarray(y[0:train_rows, ]).astype(np.int32)
-    # Create a handle for the cuml model
-    handle, stream = get_handle(use_handle, n_streams=8)
-
-    # Initialize, fit and predict using cuML's
-    # random forest classification model
-    cuml_model = curfc(max_features=1.0,
-                       n_bins=8, split_algo=0, split_criterion=0,
-                       min_rows_per_node=2,
-                       n_estimators=40, handle=handle, max_leaves=-1,
-                       max_depth=16)
-
-    cuml_model.fit(X_train, y_train)
-    cu_predict = cuml_model.predict(X_test)
-    cu_acc = cu_acc_score(y_test, cu_predict)
+    if best_alpha is None:
+        # Smoke run, the cuML scores of every candidate must match the ones
+        # of sklearn's Ridge searched over the same grid and folds
+        sk_grid = GridSearchCV(skRidge(fit_intercept=fit_intercept,
+                                       normalize=normalize),
+                               params, cv=cv, iid=False)
+        sk_grid.fit(X_train, y_train)
+        assert_almost_equal(sk_cu_grid.cv_results_['mean_test_score'],
+                            sk_grid.cv_results_['mean_test_score'],
+                            decimal=4)
+    else:
+        assert sk_cu_grid.best_params_ == {'alpha': best_alpha}
+
+
+@pytest.fixture(
+    scope="session",
+    params=[unit_param(30), quality_param(5000), stress_param(500000)])
+def classification_labels(request):
+    # Accuracy only reads the labels, so draw them directly instead of
+    # making a full classification dataset around them
+    rng = np.random.RandomState(123)
+    return rng.randint(0, 5, request.param, dtype=np.int32)
+
+
+def test_accuracy(classification_labels, handle_stream):
+    handle, stream = handle_stream
+    y = classification_labels
+    train_rows = np.int32(y.shape[0]*0.8)
+    y_test = y[train_rows:]
+
+    # Deterministically mislabel every 7th sample so the metric sees a
+    # non-trivial mix of correct and incorrect predictions
+    mislabeled = np.arange(y_test.shape[0]) % 7 == 0
+    cu_predict = np.where(mislabeled, (y_test + 1) % 5, y_test)
+    cu_predict = cu_predict.astype(np.int32)
+
+    cu_acc = cu_acc_score(y_test, cu_predict, handle=handle)
     cu_acc_using_sk = sk_acc_score(y_test, cu_predict)
-    # compare the accuracy of the two models
+    # compare the accuracy against sklearn's implementation
     assert array_equal(cu_acc, cu_acc_using_sk)
 
 
@@ -149,9 +151,21 @@ dataset_names = ['noisy_circles', 'noisy_moons', 'aniso'] + \
                  for ds in ['blobs', 'varied']]
 
 
+@lru_cache(maxsize=None)
+def _kmeans(n_clusters):
+    # fit_predict re-initializes the centroids on every call, so one model
+    # per n_clusters can be shared by all the dataset patterns. Labels are
+    # returned as CuPy arrays so that they stay on the device.
+    return cuml.KMeans(n_clusters=n_clusters, output_type='cupy')
+
+
+# Above this size the predicted labels no longer come from KMeans
+_ARS_STRESS_ROWS = 500000
+
+
 @pytest.mark.parametrize('name', dataset_names)
 @pytest.mark.parametrize('nrows', [unit_param(20), quality_param(5000),
-                         stress_param(500000)])
+                         stress_param(_ARS_STRESS_ROWS)])
 def test_rand_index_score(name, nrows):
 
     default_base = {'quantile': .3,
@@ -166,192 +180,249 @@ def test_rand_index_score(name, nrows):
     params = default_base.copy()
     params.update(pat[1])
 
-    cuml_kmeans = cuml.KMeans(n_clusters=params['n_clusters'])
-
     X, y = pat[0]
 
     X = StandardScaler().fit_transform(X)
 
-    cu_y_pred = cuml_kmeans.fit_predict(X)
+    if nrows >= _ARS_STRESS_ROWS:
+        # At stress size KMeans dwarfs the O(n) metric under test, so derive
+        # the predicted labels from a cheap deterministic split instead
+        cu_y_pred = cp.asarray((X[:, 0] > 0).astype(np.int32))
+    else:
+        cu_y_pred = _kmeans(params['n_clusters']).fit_predict(X)
 
-    cu_score = cu_ars(y, cu_y_pred)
+    y_dev = cp.asarray(y.astype(np.int32))
+    cu_score = cu_ars(y_dev, cu_y_pred)
     cu_score_using_sk = sk_ars(y, cp.asnumpy(cu_y_pred))
 
     assert array_equal(cu_score, cu_score_using_sk)
 
 
-def score_homogeneity(ground_truth, predictions, use_handle):
-    return score_labeling_with_handle(cuml.metrics.homogeneity_score,
-                                      ground_truth,
-                                      predictions,
-                                      use_handle,
-                                      dtype=np.int32)
-
-
-def score_completeness(ground_truth, predictions, use_handle):
-    return score_labeling_with_handle(cuml.metrics.completeness_score,
-                                      ground_truth,
-                                      predictions,
-                                      use_handle,
-                                      dtype=np.int32)
-
-
-def score_mutual_info(ground_truth, predictions, use_handle):
-    return score_labeling_with_handle(cuml.metrics.mutual_info_score,
-                                      ground_truth,
-                                      predictions,
-                                      use_handle,
-                                      dtype=np.int32)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('data', [([0, 0, 1, 1], [1, 1, 0, 0]),
-                                  ([0, 0, 1, 1], [0, 0, 1, 1])])
-def test_homogeneity_perfect_labeling(use_handle, data):
-    # Perfect labelings are homogeneous
-    hom = score_homogeneity(*data, use_handle)
-    assert_almost_equal(hom, 1.0, decimal=4)
+# Small inputs shared by the tiny metric cases, built once at import and
+# copied to the device only once per session through _tiny_device_inputs
+_TINY_INPUTS = {
+    'pairs': np.array([0, 0, 1, 1], dtype=np.int32),
+    'swapped_pairs': np.array([1, 1, 0, 0], dtype=np.int32),
+    'split_pairs': np.array([0, 0, 1, 2], dtype=np.int32),
+    'distinct': np.array([0, 1, 2, 3], dtype=np.int32),
+    'alternating': np.array([0, 1, 0, 1], dtype=np.int32),
+    'constant': np.array([0, 0, 0, 0], dtype=np.int32),
+    'empty': np.array([], dtype=np.int32),
+    'r2_true': np.array([0.1, 0.2, 0.3, 0.4, 0.5]),
+    'r2_pred': np.array([0.12, 0.22, 0.32, 0.42, 0.52]),
+}
+
+
+@lru_cache(maxsize=None)
+def _random_labels(low, high, n, dtype=np.int32, seed=1234):
+    # Takes the generation parameters rather than a generator lambda, like
+    # generate_random_labels does, so that the labels can be memoized and
+    # tests sharing them reuse the same device copies
+    rng = np.random.RandomState(seed)
+    # Both labelings are always consumed together, keep them as the two rows
+    # of a single buffer so they are uploaded and stored contiguously. The
+    # buffer is page-locked, so the copy of the larger labelings does not go
+    # through an extra pageable staging copy in the driver
+    labels = cuda.pinned_array((2, n), dtype=dtype)
+    labels[0] = rng.randint(low, high, n, dtype=dtype)
+    labels[1] = rng.randint(low, high, n, dtype=dtype)
+    labels_dev = cp.asarray(labels)
+    return labels_dev[0], labels_dev[1], labels[0], labels[1]
+
+
+@lru_cache(maxsize=None)
+def _sk_cluster_scores(low, high, n):
+    # Keyed on the generation parameters of _random_labels, like the labels
+    # themselves, so the sklearn references are only computed once per
+    # labeling even though every test runs with and without a handle
+    _, _, a, b = _random_labels(low, high, n)
+    hom, com = homogeneity_completeness_v_measure(a, b)[:2]
+    mi = sk_mutual_info_score(a, b)
+    return hom, com, mi
+
+
+def score_homogeneity(ground_truth, predictions, handle):
+    return cuml.metrics.homogeneity_score(ground_truth, predictions,
+                                          handle=handle)
+
+
+def score_completeness(ground_truth, predictions, handle):
+    return cuml.metrics.completeness_score(ground_truth, predictions,
+                                           handle=handle)
+
+
+def score_mutual_info(ground_truth, predictions, handle):
+    return cuml.metrics.mutual_info_score(ground_truth, predictions,
+                                          handle=handle)
+
+
+# metric function name: (decimal,
+#                        [(ground truth, predictions, dtype, expected score)])
+_TINY_CASES = {
+    'r2_score': (7, [
+        ('r2_true', 'r2_pred', np.float32, 0.98),
+        ('r2_true', 'r2_pred', np.float64, 0.98),
+    ]),
+    'homogeneity_score': (4, [
+        # Perfect labelings are homogeneous
+        ('pairs', 'swapped_pairs', np.int32, 1.0),
+        ('pairs', 'pairs', np.int32, 1.0),
+        # Non-perfect labelings that further split classes into more
+        # clusters can be perfectly homogeneous
+        ('pairs', 'split_pairs', np.int32, 1.0),
+        ('pairs', 'distinct', np.int32, 1.0),
+        # Clusters that include samples from different classes do not make
+        # for an homogeneous labeling
+        ('pairs', 'alternating', np.int32, 0.0),
+        ('pairs', 'constant', np.int32, 0.0),
+    ]),
+    'completeness_score': (4, [
+        # Perfect labelings are complete
+        ('pairs', 'swapped_pairs', np.int32, 1.0),
+        ('pairs', 'pairs', np.int32, 1.0),
+        # Non-perfect labelings that assign all classes members to the same
+        # clusters are still complete
+        ('pairs', 'constant', np.int32, 1.0),
+        ('distinct', 'pairs', np.int32, 1.0),
+        # If classes members are split across different clusters, the
+        # assignment cannot be complete
+        ('pairs', 'alternating', np.int32, 0.0),
+        ('constant', 'distinct', np.int32, 0.0),
+    ]),
+    'mutual_info_score': (4, [
+        # Any labeling that recovers the two pairs shares their full
+        # entropy, one that is independent from them shares none of it
+        ('pairs', 'swapped_pairs', np.int32, np.log(2)),
+        ('pairs', 'pairs', np.int32, np.log(2)),
+        ('pairs', 'split_pairs', np.int32, np.log(2)),
+        ('pairs', 'distinct', np.int32, np.log(2)),
+        ('pairs', 'alternating', np.int32, 0.0),
+        ('pairs', 'constant', np.int32, 0.0),
+    ]),
+    'homogeneity_and_completeness': (4, [
+        # Perfect labelings are both homogeneous and complete
+        ('pairs', 'swapped_pairs', np.int32, (1.0, 1.0)),
+        # Splitting a class keeps the labeling homogeneous, but the split
+        # pair only shares ln(2) of its 1.5 * ln(2) entropy with the classes
+        ('pairs', 'split_pairs', np.int32, (1.0, 2 / 3)),
+        # A single cluster is complete but not homogeneous
+        ('pairs', 'constant', np.int32, (0.0, 1.0)),
+        # Empty labelings are scored as perfect, like sklearn does
+        ('empty', 'empty', np.int32, (1.0, 1.0)),
+    ]),
+}
+
+
+def _to_device_batched(arrays, alignment=256):
+    # Packs the arrays into one host buffer so that they are copied with a
+    # single transfer, and returns views into the one device allocation
+    arrays = [np.ascontiguousarray(arr) for arr in arrays]
+    sizes = [-(-arr.nbytes // alignment) * alignment for arr in arrays]
+    offsets = np.cumsum([0] + sizes)
+
+    host = np.empty(offsets[-1], dtype=np.uint8)
+    for arr, offset in zip(arrays, offsets):
+        host[offset:offset + arr.nbytes] = arr.reshape(-1).view(np.uint8)
+    dev = cp.asarray(host)
+
+    return [dev[offset:offset + arr.nbytes].view(arr.dtype).reshape(arr.shape)
+            for arr, offset in zip(arrays, offsets)]
+
+
+@lru_cache(maxsize=None)
+def _tiny_device_inputs():
+    # Every (input, dtype) pair read by _TINY_CASES, copied to the device
+    # together with a single transfer
+    keys = list(dict.fromkeys((name, dtype)
+                              for _, cases in _TINY_CASES.values()
+                              for ground_truth, predictions, dtype, _ in cases
+                              for name in (ground_truth, predictions)))
+    arrays = _to_device_batched([_TINY_INPUTS[name].astype(dtype, copy=False)
+                                 for name, dtype in keys])
+    return dict(zip(keys, arrays))
+
+
+@pytest.mark.parametrize('metric', list(_TINY_CASES))
+def test_tiny_metric(handle_stream, metric):
+    handle, stream = handle_stream
+    score_func = getattr(cuml.metrics, metric)
+    decimal, cases = _TINY_CASES[metric]
+
+    inputs = _tiny_device_inputs()
+
+    scores = np.array([score_func(inputs[ground_truth, dtype],
+                                  inputs[predictions, dtype],
+                                  handle=handle)
+                       for ground_truth, predictions, dtype, _ in cases])
+    expected = np.array([case[-1] for case in cases])
+
+    # Same tolerance as assert_almost_equal, but a single assertion that
+    # reports every mismatching case at once
+    np.testing.assert_allclose(scores, expected, rtol=0,
+                               atol=1.5 * 10. ** -decimal)
 
 
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('data', [([0, 0, 1, 1], [0, 0, 1, 2]),
-                                  ([0, 0, 1, 1], [0, 1, 2, 3])])
-def test_homogeneity_non_perfect_labeling(use_handle, data):
-    # Non-perfect labelings that further split classes into more clusters can
-    # be perfectly homogeneous
-    hom = score_homogeneity(*data, use_handle)
-    assert_almost_equal(hom, 1.0, decimal=4)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('data', [([0, 0, 1, 1], [0, 1, 0, 1]),
-                                  ([0, 0, 1, 1], [0, 0, 0, 0])])
-def test_homogeneity_non_homogeneous_labeling(use_handle, data):
-    # Clusters that include samples from different classes do not make for an
-    # homogeneous labeling
-    hom = score_homogeneity(*data, use_handle)
-    assert_almost_equal(hom, 0.0, decimal=4)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
 @pytest.mark.parametrize('input_range', [[0, 1000],
                                          [-1000, 1000]])
-def test_homogeneity_score_big_array(use_handle, input_range):
-    a, b, _, _ = generate_random_labels(lambda rd: rd.randint(*input_range,
-                                                              int(10e4),
-                                                              dtype=np.int32))
-    score = score_homogeneity(a, b, use_handle)
-    ref = sk_homogeneity_score(a, b)
-    np.testing.assert_almost_equal(score, ref, decimal=4)
+def test_cluster_metrics_big_array(handle_stream, input_range):
+    handle, stream = handle_stream
+    a, b, _, _ = _random_labels(*input_range, int(10e4))
+    hom = score_homogeneity(a, b, handle)
+    com = score_completeness(a, b, handle)
+    mi = score_mutual_info(a, b, handle)
+    fused_hom, fused_com = \
+        cuml.metrics.homogeneity_and_completeness(a, b, handle=handle)
+
+    ref_hom, ref_com, ref_mi = _sk_cluster_scores(*input_range,
+                                                  int(10e4))
+    np.testing.assert_almost_equal(hom, ref_hom, decimal=4)
+    np.testing.assert_almost_equal(com, ref_com, decimal=4)
+    np.testing.assert_almost_equal(mi, ref_mi, decimal=4)
+    np.testing.assert_almost_equal(fused_hom, ref_hom, decimal=4)
+    np.testing.assert_almost_equal(fused_com, ref_com, decimal=4)
 
 
-@pytest.mark.parametrize('use_handle', [True, False])
 @pytest.mark.parametrize('input_range', [[0, 2],
                                          [-5, 20],
                                          [int(-10e2), int(10e2)]])
-def test_homogeneity_completeness_symmetry(use_handle, input_range):
-    a, b, _, _ = generate_random_labels(lambda rd: rd.randint(*input_range,
-                                                              int(10e3),
-                                                              dtype=np.int32))
-    hom = score_homogeneity(a, b, use_handle)
-    com = score_completeness(b, a, use_handle)
+def test_homogeneity_completeness_symmetry(handle_stream, input_range):
+    handle, stream = handle_stream
+    a, b, _, _ = _random_labels(*input_range, int(10e3))
+    hom_ab, com_ab = cuml.metrics.homogeneity_and_completeness(a, b,
+                                                               handle=handle)
+    hom_ba, com_ba = cuml.metrics.homogeneity_and_completeness(b, a,
+                                                               handle=handle)
+    hom = score_homogeneity(a, b, handle)
+    com = score_completeness(b, a, handle)
     np.testing.assert_almost_equal(hom, com, decimal=4)
+    np.testing.assert_almost_equal(hom_ab, com_ba, decimal=4)
+    np.testing.assert_almost_equal(com_ab, hom_ba, decimal=4)
 
 
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('input_labels', [([0, 0, 1, 1], [1, 1, 0, 0]),
-                                          ([0, 0, 1, 1], [0, 0, 1, 1]),
-                                          ([0, 0, 1, 1], [0, 0, 1, 2]),
-                                          ([0, 0, 1, 1], [0, 1, 2, 3]),
-                                          ([0, 0, 1, 1], [0, 1, 0, 1]),
-                                          ([0, 0, 1, 1], [0, 0, 0, 0])])
-def test_mutual_info_score(use_handle, input_labels):
-    score = score_mutual_info(*input_labels, use_handle)
-    ref = sk_mutual_info_score(*input_labels)
-    np.testing.assert_almost_equal(score, ref, decimal=4)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('input_range', [[0, 1000],
-                                         [-1000, 1000]])
-def test_mutual_info_score_big_array(use_handle, input_range):
-    a, b, _, _ = generate_random_labels(lambda rd: rd.randint(*input_range,
-                                                              int(10e4),
-                                                              dtype=np.int32))
-    score = score_mutual_info(a, b, use_handle)
-    ref = sk_mutual_info_score(a, b)
-    np.testing.assert_almost_equal(score, ref, decimal=4)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
 @pytest.mark.parametrize('n', [14])
-def test_mutual_info_score_range_equal_samples(use_handle, n):
-    input_range = (-n, n)
-    a, b, _, _ = generate_random_labels(lambda rd: rd.randint(*input_range,
-                                                              n,
-                                                              dtype=np.int32))
-    score = score_mutual_info(a, b, use_handle)
-    ref = sk_mutual_info_score(a, b)
+def test_mutual_info_score_range_equal_samples(handle_stream, n):
+    handle, stream = handle_stream
+    a, b, a_host, b_host = _random_labels(-n, n, n)
+    score = score_mutual_info(a, b, handle)
+    ref = sk_mutual_info_score(a_host, b_host)
     np.testing.assert_almost_equal(score, ref, decimal=4)
 
 
-@pytest.mark.parametrize('use_handle', [True, False])
 @pytest.mark.parametrize('input_range', [[0, 19],
                                          [0, 2],
                                          [-5, 20]])
 @pytest.mark.parametrize('n_samples', [129, 258])
-def test_mutual_info_score_many_blocks(use_handle, input_range, n_samples):
-    a, b, _, _ = generate_random_labels(lambda rd: rd.randint(*input_range,
-                                                              n_samples,
-                                                              dtype=np.int32))
-    score = score_mutual_info(a, b, use_handle)
-    ref = sk_mutual_info_score(a, b)
-    np.testing.assert_almost_equal(score, ref, decimal=4)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('data', [([0, 0, 1, 1], [1, 1, 0, 0]),
-                                  ([0, 0, 1, 1], [0, 0, 1, 1])])
-def test_completeness_perfect_labeling(use_handle, data):
-    # Perfect labelings are complete
-    com = score_completeness(*data, use_handle)
-    np.testing.assert_almost_equal(com, 1.0, decimal=4)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('data', [([0, 0, 1, 1], [0, 0, 0, 0]),
-                                  ([0, 1, 2, 3], [0, 0, 1, 1])])
-def test_completeness_non_perfect_labeling(use_handle, data):
-    # Non-perfect labelings that assign all classes members to the same
-    # clusters are still complete
-    com = score_completeness(*data, use_handle)
-    np.testing.assert_almost_equal(com, 1.0, decimal=4)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('data', [([0, 0, 1, 1], [0, 1, 0, 1]),
-                                  ([0, 0, 0, 0], [0, 1, 2, 3])])
-def test_completeness_non_complete_labeling(use_handle, data):
-    # If classes members are split across different clusters, the assignment
-    # cannot be complete
-    com = score_completeness(*data, use_handle)
-    np.testing.assert_almost_equal(com, 0.0, decimal=4)
-
-
-@pytest.mark.parametrize('use_handle', [True, False])
-@pytest.mark.parametrize('input_range', [[0, 1000],
-                                         [-1000, 1000]])
-def test_completeness_score_big_array(use_handle, input_range):
-    a, b, _, _ = generate_random_labels(lambda rd: rd.randint(*input_range,
-                                                              int(10e4),
-                                                              dtype=np.int32))
-    score = score_completeness(a, b, use_handle)
-    ref = sk_completeness_score(a, b)
+def test_mutual_info_score_many_blocks(handle_stream, input_range,
+                                       n_samples):
+    handle, stream = handle_stream
+    a, b, a_host, b_host = _random_labels(*input_range, n_samples)
+    score = score_mutual_info(a, b, handle)
+    ref = sk_mutual_info_score(a_host, b_host)
     np.testing.assert_almost_equal(score, ref, decimal=4)
 
 
 def test_regression_metrics():
-    y_true = np.arange(50, dtype=np.int)
+    y_true = np.arange(50, dtype=np.int32)
     y_pred = y_true + 1
     assert_almost_equal(mean_squared_error(y_true, y_pred), 1.)
     assert_almost_equal(mean_squared_log_error(y_true, y_pred),
@@ -384,8 +455,8 @@ def test_regression_metrics_random(n_samples, dtype, function):
 
 @pytest.mark.parametrize('function', ['mse', 'mse_not_squared', 'mae', 'msle'])
 def test_regression_metrics_at_limits(function):
-    y_true = np.array([0.], dtype=np.float)
-    y_pred = np.array([0.], dtype=np.float)
+    y_true = np.array([0.], dtype=np.float64)
+    y_pred = np.array([0.], dtype=np.float64)
 
     cuml_reg = {
         'mse': mean_squared_error,
@@ -425,8 +496,8 @@ def test_multioutput_regression():
 
 
 def test_regression_metrics_multioutput_array():
-    y_true = np.array([[1, 2], [2.5, -1], [4.5, 3], [5, 7]], dtype=np.float)
-    y_pred = np.array([[1, 1], [2, -1], [5, 4], [5, 6.5]], dtype=np.float)
+    y_true = np.array([[1, 2], [2.5, -1], [4.5, 3], [5, 7]], dtype=np.float64)
+    y_pred = np.array([[1, 1], [2, -1], [5, 4], [5, 6.5]], dtype=np.float64)
 
     mse = mean_squared_error(y_true, y_pred, multioutput='raw_values')
     mae = mean_absolute_error(y_true, y_pred, multioutput='raw_values')
@@ -434,15 +505,15 @@ def test_regression_metrics_multioutput_array():
     cp.testing.assert_array_almost_equal(mse, [0.125, 0.5625], decimal=2)
     cp.testing.assert_array_almost_equal(mae, [0.25, 0.625], decimal=2)
 
-    weights = np.array([0.4, 0.6], dtype=np.float)
+    weights = np.array([0.4, 0.6], dtype=np.float64)
     msew = mean_squared_error(y_true, y_pred, multioutput=weights)
     rmsew = mean_squared_error(y_true, y_pred, multioutput=weights,
                                squared=False)
     assert_almost_equal(msew, 0.39, decimal=2)
     assert_almost_equal(rmsew, 0.62, decimal=2)
 
-    y_true = np.array([[0, 0]] * 4, dtype=np.int)
-    y_pred = np.array([[1, 1]] * 4, dtype=np.int)
+    y_true = np.array([[0, 0]] * 4, dtype=np.int32)
+    y_pred = np.array([[1, 1]] * 4, dtype=np.int32)
     mse = mean_squared_error(y_true, y_pred, multioutput='raw_values')
     mae = mean_absolute_error(y_true, y_pred, multioutput='raw_values')
     cp.testing.assert_array_almost_equal(mse, [1., 1.], decimal=2)
@@ -458,9 +529,9 @@ def test_regression_metrics_multioutput_array():
 
 @pytest.mark.parametrize('function', ['mse', 'mae'])
 def test_regression_metrics_custom_weights(function):
-    y_true = np.array([1, 2, 2.5, -1], dtype=np.float)
-    y_pred = np.array([1, 1, 2, -1], dtype=np.float)
-    weights = np.array([0.2, 0.25, 0.4, 0.15], dtype=np.float)
+    y_true = np.array([1, 2, 2.5, -1], dtype=np.float64)
+    y_pred = np.array([1, 1, 2, -1], dtype=np.float64)
+    weights = np.array([0.2, 0.25, 0.4, 0.15], dtype=np.float64)
 
     cuml_reg, sklearn_reg = {
         'mse': (mean_squared_error, sklearn_mse),
@@ -473,18 +544,17 @@ def test_regression_metrics_custom_weights(function):
 
 
 def test_mse_vs_msle_custom_weights():
-    y_true = np.array([0.5, 2, 7, 6], dtype=np.float)
-    y_pred = np.array([0.5, 1, 8, 8], dtype=np.float)
-    weights = np.array([0.2, 0.25, 0.4, 0.15], dtype=np.float)
+    y_true = np.array([0.5, 2, 7, 6], dtype=np.float64)
+    y_pred = np.array([0.5, 1, 8, 8], dtype=np.float64)
+    weights = np.array([0.2, 0.25, 0.4, 0.15], dtype=np.float64)
     msle = mean_squared_log_error(y_true, y_pred, sample_weight=weights)
     msle2 = mean_squared_error(np.log(1 + y_true), np.log(1 + y_pred),
                                sample_weight=weights)
     assert_almost_equal(msle, msle2, decimal=2)
 
 
-@pytest.mark.parametrize('use_handle', [True, False])
-def test_entropy(use_handle):
-    handle, stream = get_handle(use_handle)
+def test_entropy(handle_stream):
+    handle, stream = handle_stream
 
     # The outcome of a fair coin is the most uncertain:
     # in base 2 the result is 1 (One bit of entropy).
@@ -500,14 +570,13 @@ def test_entropy(use_handle):
 
 @pytest.mark.parametrize('n_samples', [50, stress_param(500000)])
 @pytest.mark.parametrize('base', [None, 2, 10, 50])
-@pytest.mark.parametrize('use_handle', [True, False])
-def test_entropy_random(n_samples, base, use_handle):
+def test_entropy_random(n_samples, base, handle_stream):
     if has_scipy():
         from scipy.stats import entropy as sp_entropy
     else:
         pytest.skip('Skipping test_entropy_random because Scipy is missing')
 
-    handle, stream = get_handle(use_handle)
+    handle, stream = handle_stream
 
     clustering, _, _, _ = \
         generate_random_labels(lambda rng: rng.randint(0, 1000, n_samples))
@@ -627,8 +696,8 @@ def test_roc_auc_score_random(n_samples, dtype):
 
 
 def test_roc_auc_score_at_limits():
-    y_true = np.array([0., 0., 0.], dtype=np.float)
-    y_pred = np.array([0., 0.5, 1.], dtype=np.float)
+    y_true = np.array([0., 0., 0.], dtype=np.float64)
+    y_pred = np.array([0., 0.5, 1.], dtype=np.float64)
 
     err_msg = ("roc_auc_score cannot be used when "
                "only one class present in y_true. ROC AUC score "
@@ -637,8 +706,8 @@ def test_roc_auc_score_at_limits():
     with pytest.raises(ValueError, match=err_msg):
         roc_auc_score(y_true, y_pred)
 
-    y_true = np.array([0., 0.5, 1.0], dtype=np.float)
-    y_pred = np.array([0., 0.5, 1.], dtype=np.float)
+    y_true = np.array([0., 0.5, 1.0], dtype=np.float64)
+    y_pred = np.array([0., 0.5, 1.], dtype=np.float64)
 
     err_msg = ("Continuous format of y_true  "
                "is not supported by roc_auc_score")
@@ -674,8 +743,8 @@ def test_log_loss_random(n_samples, dtype):
 
 
 def test_log_loss_at_limits():
-    y_true = np.array([0., 1., 2.], dtype=np.float)
-    y_pred = np.array([0., 0.5, 1.], dtype=np.float)
+    y_true = np.array([0., 1., 2.], dtype=np.float64)
+    y_pred = np.array([0., 0.5, 1.], dtype=np.float64)
 
     err_msg = ("The shape of y_pred doesn't "
                "match the number of classes")
@@ -683,8 +752,8 @@ def test_log_loss_at_limits():
     with pytest.raises(ValueError, match=err_msg):
         log_loss(y_true, y_pred)
 
-    y_true = np.array([0., 0.5, 1.0], dtype=np.float)
-    y_pred = np.array([0., 0.5, 1.], dtype=np.float)
+    y_true = np.array([0., 0.5, 1.0], dtype=np.float64)
+    y_pred = np.array([0., 0.5, 1.], dtype=np.float64)
 
     err_msg = ("'y_true' can only have integer values")
     with pytest.raises(ValueError, match=err_msg):